@@ -19,13 +19,36 @@ Uso:
   python dedup_quiz_json.py -i input.json -o out.json --no-strip-accents
   # manter a ÚLTIMA ocorrência de cada questão
   python dedup_quiz_json.py -i input.json -o out.json --keep-last
+  # corpora muito grandes: particiona por hash da chave em 64 arquivos em disco
+  python dedup_quiz_json.py -i input.json -o out.json --partitions 64 --workers 8
+
+Modo particionado (--partitions N):
+- O arquivo é dividido em faixas contíguas de itens, uma por worker
+- Cada worker normaliza as chaves da sua faixa, grava o texto final (indent=2) dos
+  itens e roteia (índice, chave) para um de N arquivos em disco pelo hash da chave
+- Cada partição é deduplicada de forma independente e em paralelo, só com as chaves
+- Cada worker copia o texto dos itens mantidos da sua faixa; o processo principal
+  apenas concatena as faixas, então a ordem final, a semântica de --keep-last e o
+  relatório de --list-removed são idênticos aos do modo em memória
 """
 import argparse
+import hashlib
 import json
+import multiprocessing
+import os
 import re
+import shutil
+import sys
+import tempfile
 import unicodedata
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, TextIO, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 
 def normalize_text(s: Any, strip_accents: bool = True) -> str:
@@ -49,6 +72,238 @@ def make_key(item: Dict[str, Any], include_quiz: bool, strip_accents: bool) -> s
     return q
 
 
+def format_removed(key: str, item: Dict[str, Any]) -> str:
+    q = item.get("question", "")
+    quiz = item.get("quiz", "")
+    resumo = (q[:80] + "…") if isinstance(q, str) and len(q) > 80 else q
+    return f"- [{key}] quiz='{quiz}' question='{resumo}'"
+
+
+def partition_of(key: str, partitions: int) -> int:
+    """Partição estável da chave (não depende de PYTHONHASHSEED entre processos)."""
+    digest = hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") % partitions
+
+
+# Itens herdados pelos workers via fork (copy-on-write), sem pickle por item.
+_ITEMS: List[Dict[str, Any]] = []
+
+# O json.dumps sempre escapa caracteres de controle dentro de strings, então o único
+# "\n" cru de um item renderizado é o da indentação; ele é trocado por NUL para que
+# cada item caiba numa linha do arquivo de spill.
+_NL = "\x00"
+
+
+def _open_text(path: Path, mode: str) -> TextIO:
+    return path.open(mode, encoding="utf-8", newline="\n")
+
+
+def _spill_range(
+    task: Tuple[int, int, int, Optional[List[Dict[str, Any]]]],
+    tmp_dir: Path,
+    partitions: int,
+    include_quiz: bool,
+    strip_accents: bool,
+) -> None:
+    """
+    Fase 1 (worker da faixa c): grava o texto final de cada item em render_c e
+    '<índice>\\t<chave>' em keys_c_p. A chave normalizada não contém \\t nem \\n.
+    """
+    c, start, end, chunk = task
+    items = chunk if chunk is not None else _ITEMS
+    offset = start if chunk is not None else 0
+    handles = [_open_text(tmp_dir / f"keys_{c:05d}_{p:05d}", "w") for p in range(partitions)]
+    try:
+        with _open_text(tmp_dir / f"render_{c:05d}", "w") as render:
+            for idx in range(start, end):
+                it = items[idx - offset]
+                key = make_key(it, include_quiz=include_quiz, strip_accents=strip_accents)
+                handles[partition_of(key, partitions)].write(f"{idx}\t{key}\n")
+                body = json.dumps(it, ensure_ascii=False, indent=2).replace("\n", _NL + "  ")
+                render.write(body + "\n")
+    finally:
+        for h in handles:
+            h.close()
+
+
+def _dedup_partition(p: int, tmp_dir: Path, ranges: int, keep_last: bool) -> int:
+    """
+    Fase 2 (worker da partição p): lê só as chaves, em ordem crescente de índice, e
+    grava os removidos em removed_p_c, separados pela faixa de origem.
+    Retorna quantos itens foram removidos.
+    """
+    sources = [tmp_dir / f"keys_{c:05d}_{p:05d}" for c in range(ranges)]
+
+    def records():
+        for c, src in enumerate(sources):
+            with _open_text(src, "r") as f:
+                for line in f:
+                    idx, key = line.rstrip("\n").split("\t", 1)
+                    yield c, int(idx), key
+
+    last_index: Dict[str, int] = {}
+    if keep_last:
+        for _, idx, key in records():
+            last_index[key] = idx
+    seen_keys = set()
+
+    removed = 0
+    outs: Dict[int, TextIO] = {}
+    try:
+        for c, idx, key in records():
+            if keep_last:
+                dup = last_index[key] != idx
+            else:
+                dup = key in seen_keys
+                seen_keys.add(key)
+            if dup:
+                if c not in outs:
+                    outs[c] = _open_text(tmp_dir / f"removed_{p:05d}_{c:05d}", "w")
+                outs[c].write(f"{idx}\t{key}\n")
+                removed += 1
+    finally:
+        for h in outs.values():
+            h.close()
+    for src in sources:
+        src.unlink()
+    return removed
+
+
+def _write_range(c: int, start: int, tmp_dir: Path, partitions: int, list_removed: bool) -> None:
+    """
+    Fase 3 (worker da faixa c): copia o texto dos itens mantidos para out_c, já com
+    os separadores do array, e (com --list-removed) as linhas do relatório para report_c.
+    """
+    removed: Dict[int, str] = {}
+    for p in range(partitions):
+        src = tmp_dir / f"removed_{p:05d}_{c:05d}"
+        if src.exists():
+            with _open_text(src, "r") as f:
+                for line in f:
+                    idx, key = line.rstrip("\n").split("\t", 1)
+                    removed[int(idx)] = key
+
+    report = _open_text(tmp_dir / f"report_{c:05d}", "w") if list_removed else None
+    try:
+        with _open_text(tmp_dir / f"render_{c:05d}", "r") as src, \
+                _open_text(tmp_dir / f"out_{c:05d}", "w") as out:
+            first = True
+            for idx, line in enumerate(src, start):
+                body = line[:-1].replace(_NL, "\n")
+                if idx in removed:
+                    if report is not None:
+                        report.write(format_removed(removed[idx], json.loads(body)) + "\n")
+                    continue
+                out.write(("  " if first else ",\n  ") + body)
+                first = False
+    finally:
+        if report is not None:
+            report.close()
+    (tmp_dir / f"render_{c:05d}").unlink()
+
+
+def _check_open_files(partitions: int) -> None:
+    """Cada worker da fase 1 mantém as N partições abertas ao mesmo tempo."""
+    if resource is None:
+        return
+    soft, _ = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != resource.RLIM_INFINITY and partitions + 32 > soft:
+        raise SystemExit(
+            f"--partitions {partitions} excede o limite de arquivos abertos ({soft}). "
+            f"Use no máximo {max(1, soft - 32)} ou aumente o limite (ulimit -n)."
+        )
+
+
+def dedup_partitioned(
+    in_path: Path,
+    out_path: Path,
+    include_quiz: bool,
+    strip_accents: bool,
+    keep_last: bool,
+    partitions: int,
+    workers: Optional[int],
+    spill_dir: Optional[Path],
+    report: Optional[TextIO] = None,
+) -> Tuple[int, int]:
+    """
+    Deduplicação particionada por hash da chave, com spill em disco.
+    O corpus carregado é descartado pelo processo principal assim que o spill termina.
+    Com report, grava nele as linhas de --list-removed na ordem original.
+    Retorna (itens lidos, itens removidos).
+    """
+    global _ITEMS
+    _check_open_files(partitions)
+    workers = workers or os.cpu_count() or 1
+    # Só usa fork quando ele já é o método padrão (Linux). No macOS o padrão é spawn
+    # porque fork pode derrubar o filho depois que frameworks do sistema carregam.
+    can_fork = multiprocessing.get_start_method() == "fork"
+    ctx = multiprocessing.get_context()
+
+    items = load_items(in_path)
+    if not items:
+        raise SystemExit("Nenhum item de quiz encontrado no arquivo de entrada.")
+    total = len(items)
+    ranges = min(workers, total)
+    starts = [total * c // ranges for c in range(ranges)]
+    bounds = list(zip(starts, starts[1:] + [total]))
+
+    with tempfile.TemporaryDirectory(prefix="dedup_", dir=spill_dir) as tmp:
+        tmp_dir = Path(tmp)
+
+        # Fase 1: com fork os workers leem _ITEMS direto; sem fork a faixa vai por pickle
+        _ITEMS = items
+        tasks = [(c, s, e, None if can_fork else items[s:e]) for c, (s, e) in enumerate(bounds)]
+        try:
+            with ctx.Pool(workers) as pool:
+                pool.map(
+                    partial(
+                        _spill_range,
+                        tmp_dir=tmp_dir,
+                        partitions=partitions,
+                        include_quiz=include_quiz,
+                        strip_accents=strip_accents,
+                    ),
+                    tasks,
+                    chunksize=1,
+                )
+        finally:
+            _ITEMS = []
+            del items, tasks
+
+        with ctx.Pool(workers) as pool:
+            # Fase 2: deduplicação independente de cada partição
+            removed = sum(pool.map(
+                partial(_dedup_partition, tmp_dir=tmp_dir, ranges=ranges, keep_last=keep_last),
+                range(partitions),
+                chunksize=1,
+            ))
+            # Fase 3: cada faixa grava seus itens mantidos
+            pool.starmap(
+                partial(_write_range, tmp_dir=tmp_dir, partitions=partitions, list_removed=report is not None),
+                list(enumerate(starts)),
+                chunksize=1,
+            )
+
+        # Concatena as faixas: mesmo texto que json.dumps(lista, ensure_ascii=False, indent=2)
+        wrote = False
+        with out_path.open("w", encoding="utf-8") as out:
+            for c in range(ranges):
+                part = tmp_dir / f"out_{c:05d}"
+                if part.stat().st_size == 0:
+                    continue
+                out.write(",\n" if wrote else "[\n")
+                with _open_text(part, "r") as src:
+                    shutil.copyfileobj(src, out)
+                wrote = True
+            out.write("\n]" if wrote else "[]")
+
+        if report is not None:
+            for c in range(ranges):
+                with _open_text(tmp_dir / f"report_{c:05d}", "r") as src:
+                    shutil.copyfileobj(src, report)
+    return total, removed
+
+
 def load_items(path: Path) -> List[Dict[str, Any]]:
     """Carrega itens a partir de arquivo em diferentes formatos."""
     text = path.read_text(encoding="utf-8")
@@ -119,21 +374,70 @@ def main():
         action="store_true",
         help="Mantém a ÚLTIMA ocorrência de cada pergunta (padrão: mantém a PRIMEIRA)"
     )
+    ap.add_argument(
+        "--partitions",
+        type=int,
+        default=0,
+        help="Modo particionado: número de arquivos de partição em disco (padrão: 0 = tudo em memória)"
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Processos usados no modo particionado (padrão: número de CPUs)"
+    )
+    ap.add_argument(
+        "--spill-dir",
+        default=None,
+        help="Pasta para os arquivos temporários de partição (padrão: pasta temporária do sistema)"
+    )
     args = ap.parse_args()
 
     in_path = Path(args.input)
     out_path = Path(args.output)
 
+    if args.partitions < 0:
+        raise SystemExit("--partitions deve ser >= 0.")
+    if args.workers is not None and args.workers < 1:
+        raise SystemExit("--workers deve ser >= 1.")
+
     if not in_path.exists():
         raise SystemExit(f"Arquivo de entrada não encontrado: {in_path}")
+    if args.spill_dir and not Path(args.spill_dir).is_dir():
+        raise SystemExit(f"Pasta de spill não encontrada: {args.spill_dir}")
+
+    strip_accents = not args.no_strip_accents
+    include_quiz = args.include_quiz_in_key
+
+    if args.partitions:
+        # Relatório vai para um arquivo temporário para não manter os removidos em memória
+        with tempfile.TemporaryFile("w+", encoding="utf-8") as report:
+            total, n_removed = dedup_partitioned(
+                in_path,
+                out_path,
+                include_quiz=include_quiz,
+                strip_accents=strip_accents,
+                keep_last=args.keep_last,
+                partitions=args.partitions,
+                workers=args.workers,
+                spill_dir=Path(args.spill_dir) if args.spill_dir else None,
+                report=report if args.list_removed else None,
+            )
+            print(f"Itens lidos: {total}")
+            print(f"Itens após deduplicação: {total - n_removed}")
+            print(f"Duplicatas removidas: {n_removed}")
+
+            if args.list_removed and n_removed:
+                print("\n--- Duplicatas removidas ---")
+                sys.stdout.flush()
+                report.seek(0)
+                shutil.copyfileobj(report, sys.stdout)
+        return
 
     items = load_items(in_path)
     if not items:
         raise SystemExit("Nenhum item de quiz encontrado no arquivo de entrada.")
 
-    strip_accents = not args.no_strip_accents
-    include_quiz = args.include_quiz_in_key
-
     removed: List[Tuple[str, Dict[str, Any]]] = []
 
     if not args.keep_last:
@@ -171,10 +475,7 @@ def main():
     if args.list_removed and removed:
         print("\n--- Duplicatas removidas ---")
         for k, it in removed:
-            q = it.get("question", "")
-            quiz = it.get("quiz", "")
-            resumo = (q[:80] + "…") if isinstance(q, str) and len(q) > 80 else q
-            print(f"- [{k}] quiz='{quiz}' question='{resumo}'")
+            print(format_removed(k, it))
 
 
 if __name__ == "__main__":
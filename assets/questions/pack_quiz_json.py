@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Empacota bancos de questões em blocos comprimidos com zlib + dicionário pré-definido.
+
+Os bancos são muito repetitivos: as mesmas chaves ("quiz", "question", "wrong1..3",
+"explicacao"), os mesmos títulos de quiz e o mesmo texto padrão aparecem em todos os
+registros. O "pack" treina um dicionário (zdict) a partir do próprio corpus e comprime
+cada bloco de registros de forma independente usando esse dicionário, então um único
+bloco pode ser descomprimido sem tocar nos demais. Só usa a biblioteca padrão.
+O dicionário é gravado no pacote; se ele pesar mais do que economiza (ex.: um único
+bloco), o pack o descarta e avisa.
+
+Formato do arquivo .qzpk:
+  MAGIC (5 bytes) | tamanho do cabeçalho (uint32 big-endian) | cabeçalho JSON (UTF-8)
+  | dicionário | blocos
+Cada bloco é um array JSON compacto em UTF-8 comprimido com zlib usando o dicionário
+(qualquer inflate com suporte a dicionário lê, ex.: pako.inflate(bytes, {dictionary})).
+Os offsets do cabeçalho são relativos ao início da área de blocos.
+
+Uso:
+  python pack_quiz_json.py pack -i unido.json -o unido.qzpk
+  python pack_quiz_json.py pack -i unido.json -o unido.qzpk --by-quiz
+  python pack_quiz_json.py pack -i unido.json -o unido.qzpk --block-size 128 --dict-size 16384
+  python pack_quiz_json.py unpack -i unido.qzpk -o unido.json
+  # descomprime apenas o bloco 3
+  python pack_quiz_json.py unpack -i unido.qzpk -o bloco3.json --block 3
+  python pack_quiz_json.py info -i unido.qzpk
+"""
+import argparse
+import json
+import struct
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from dedup_quiz_json import load_items
+
+MAGIC = b"QZPK1"
+FORMAT_VERSION = 1
+MAX_DICT_SIZE = 32768  # janela do deflate; bytes além disso nunca são referenciados
+
+
+def dumps_block(items: List[Dict[str, Any]]) -> bytes:
+    return json.dumps(items, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def train_dictionary(items: List[Dict[str, Any]], size: int = MAX_DICT_SIZE) -> bytes:
+    """
+    Monta o dicionário com os fragmentos '"chave":"valor"' mais rentáveis do corpus
+    (frequência x tamanho). Fragmentos que só aparecem uma vez não ajudam blocos
+    independentes e ficam de fora. Os mais rentáveis vão para o FIM, porque o deflate
+    codifica distâncias curtas com menos bits.
+    """
+    size = min(size, MAX_DICT_SIZE)
+    fragments: Counter = Counter()
+    for it in items:
+        if not isinstance(it, dict):
+            continue
+        for k, v in it.items():
+            frag = json.dumps({k: v}, ensure_ascii=False, separators=(",", ":"))[1:-1]
+            fragments[frag] += 1
+            fragments[json.dumps(k, ensure_ascii=False) + ":"] += 1
+
+    scored = [(count * len(frag.encode("utf-8")), frag) for frag, count in fragments.items() if count > 1]
+    scored.sort(reverse=True)
+
+    chosen: List[bytes] = []
+    used = 0
+    for _, frag in scored:
+        data = frag.encode("utf-8") + b","
+        if used + len(data) > size:
+            continue
+        chosen.append(data)
+        used += len(data)
+    return b"".join(reversed(chosen))
+
+
+def split_blocks(items: List[Dict[str, Any]], block_size: int, by_quiz: bool) -> List[List[Dict[str, Any]]]:
+    """Blocos de até block_size registros; com by_quiz, cada quiz começa um bloco novo."""
+    blocks: List[List[Dict[str, Any]]] = []
+    current: List[Dict[str, Any]] = []
+    current_quiz: Any = None
+    for it in items:
+        quiz = it.get("quiz") if isinstance(it, dict) else None
+        if current and (len(current) >= block_size or (by_quiz and quiz != current_quiz)):
+            blocks.append(current)
+            current = []
+        current_quiz = quiz
+        current.append(it)
+    if current:
+        blocks.append(current)
+    return blocks
+
+
+def compress_block(data: bytes, zdict: bytes, level: int) -> bytes:
+    comp = zlib.compressobj(level, zdict=zdict) if zdict else zlib.compressobj(level)
+    return comp.compress(data) + comp.flush()
+
+
+def decompress_block(data: bytes, zdict: bytes) -> bytes:
+    decomp = zlib.decompressobj(zdict=zdict) if zdict else zlib.decompressobj()
+    return decomp.decompress(data) + decomp.flush()
+
+
+def write_pack(path: Path, zdict: bytes, blocks: List[Tuple[bytes, int, int]], level: int) -> int:
+    """blocks: (bytes comprimidos, qtd. de registros, tamanho descomprimido)."""
+    index = []
+    offset = 0
+    for comp, count, raw_size in blocks:
+        index.append({"offset": offset, "size": len(comp), "count": count, "raw_size": raw_size})
+        offset += len(comp)
+    header = json.dumps(
+        {"version": FORMAT_VERSION, "level": level, "dict_size": len(zdict), "blocks": index},
+        separators=(",", ":"),
+    ).encode("utf-8")
+    with path.open("wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack(">I", len(header)))
+        f.write(header)
+        f.write(zdict)
+        for comp, _, _ in blocks:
+            f.write(comp)
+    return len(MAGIC) + 4 + len(header) + len(zdict) + offset
+
+
+def read_pack(path: Path) -> Tuple[Dict[str, Any], bytes, bytes]:
+    """Retorna (cabeçalho, dicionário, área de blocos), validando versão e limites."""
+    raw = path.read_bytes()
+    if raw[: len(MAGIC)] != MAGIC:
+        raise SystemExit(f"Arquivo não é um pacote de quiz válido: {path}")
+    pos = len(MAGIC)
+    if len(raw) < pos + 4:
+        raise SystemExit(f"Pacote truncado (sem cabeçalho): {path}")
+    (header_len,) = struct.unpack(">I", raw[pos: pos + 4])
+    pos += 4
+    if len(raw) < pos + header_len:
+        raise SystemExit(f"Pacote truncado (cabeçalho incompleto): {path}")
+    try:
+        header = json.loads(raw[pos: pos + header_len].decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Cabeçalho inválido em '{path}': {e}")
+    if not isinstance(header, dict) or header.get("version") != FORMAT_VERSION:
+        version = header.get("version") if isinstance(header, dict) else None
+        raise SystemExit(f"Versão de pacote não suportada em '{path}': {version!r} (esperada {FORMAT_VERSION})")
+    pos += header_len
+
+    # type(...) is int: rejeita float e bool (True passaria em isinstance(..., int))
+    level = header.get("level")
+    if type(level) is not int or not 0 <= level <= 9:
+        raise SystemExit(f"Cabeçalho inválido em '{path}': nível de compressão {level!r}")
+    dict_size = header.get("dict_size")
+    blocks = header.get("blocks")
+    if type(dict_size) is not int or not 0 <= dict_size <= len(raw) - pos or not isinstance(blocks, list):
+        raise SystemExit(f"Pacote truncado ou corrompido (dicionário): {path}")
+    zdict = raw[pos: pos + dict_size]
+    area = raw[pos + dict_size:]
+    for n, blk in enumerate(blocks):
+        fields = ("offset", "size", "count", "raw_size")
+        if not isinstance(blk, dict) or any(type(blk.get(f)) is not int or blk[f] < 0 for f in fields):
+            raise SystemExit(f"Cabeçalho inválido em '{path}': bloco {n} sem {'/'.join(fields)} inteiros")
+        if blk["offset"] + blk["size"] > len(area):
+            raise SystemExit(f"Pacote truncado ou corrompido (bloco {n} fora dos limites): {path}")
+    return header, zdict, area
+
+
+def _block_bytes(header: Dict[str, Any], zdict: bytes, area: bytes, n: int) -> bytes:
+    blk = header["blocks"][n]
+    try:
+        return decompress_block(area[blk["offset"]: blk["offset"] + blk["size"]], zdict)
+    except zlib.error as e:
+        raise SystemExit(f"Bloco {n} corrompido: {e}")
+
+
+def parse_block(data: bytes, n: int) -> List[Dict[str, Any]]:
+    try:
+        return json.loads(data.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise SystemExit(f"Bloco {n} corrompido: {e}")
+
+
+def decode_throughput(
+    header: Dict[str, Any], zdict: bytes, area: bytes, wanted: Optional[Iterable[int]] = None
+) -> Tuple[float, int, List[bytes]]:
+    """
+    Descomprime os blocos pedidos (padrão: todos) e retorna (segundos, bytes
+    descomprimidos, dados). Mede só o inflate, sem o parse do JSON.
+    """
+    if wanted is None:
+        wanted = range(len(header["blocks"]))
+    start = time.perf_counter()
+    datas = [_block_bytes(header, zdict, area, n) for n in wanted]
+    return time.perf_counter() - start, sum(len(d) for d in datas), datas
+
+
+def fmt_rate(nbytes: int, seconds: float) -> str:
+    if seconds <= 0:
+        return "n/d"
+    return f"{nbytes / seconds / (1024 * 1024):.1f} MiB/s"
+
+
+def cmd_pack(args) -> None:
+    in_path = Path(args.input)
+    out_path = Path(args.output)
+    if not in_path.exists():
+        raise SystemExit(f"Arquivo de entrada não encontrado: {in_path}")
+    if args.block_size < 1:
+        raise SystemExit("--block-size deve ser >= 1.")
+    if not 0 <= args.dict_size <= MAX_DICT_SIZE:
+        raise SystemExit(f"--dict-size deve estar entre 0 e {MAX_DICT_SIZE}.")
+
+    items = load_items(in_path)
+    if not items:
+        raise SystemExit("Nenhum item de quiz encontrado no arquivo de entrada.")
+
+    parts = split_blocks(items, args.block_size, args.by_quiz)
+    chunks = [dumps_block(part) for part in parts]
+    compressed = [compress_block(data, b"", args.level) for data in chunks]
+    plain_size = sum(len(c) for c in compressed)
+
+    zdict = train_dictionary(items, args.dict_size) if args.dict_size else b""
+    dict_note = ""
+    if zdict:
+        with_dict = [compress_block(data, zdict, args.level) for data in chunks]
+        blocks_size = sum(len(c) for c in with_dict)
+        # O dicionário viaja junto no pacote; só compensa se economizar mais do que pesa
+        if len(zdict) + blocks_size < plain_size:
+            compressed = with_dict
+        else:
+            dict_note = (f" (descartado: {len(zdict)} B de dicionário + {blocks_size} B de blocos"
+                         f" >= {plain_size} B sem dicionário; use blocos menores)")
+            zdict = b""
+
+    blocks = [(comp, len(part), len(data)) for comp, part, data in zip(compressed, parts, chunks)]
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    packed_size = write_pack(out_path, zdict, blocks, args.level)
+
+    # Referências: o mesmo JSON "bonito" que merge_jsons.py / dedup_quiz_json.py geram,
+    # e esse JSON comprimido inteiro com zlib (sem acesso a blocos isolados)
+    pretty = json.dumps(items, ensure_ascii=False, indent=2).encode("utf-8")
+    whole_size = len(zlib.compress(pretty, args.level))
+    header, zdict_read, area = read_pack(out_path)
+    seconds, raw_total, _ = decode_throughput(header, zdict_read, area)
+
+    print(f"Itens empacotados: {len(items)} em {len(blocks)} blocos")
+    print(f"Dicionário: {len(zdict)} bytes{dict_note}")
+    print(f"JSON original (indent=2): {len(pretty)} bytes")
+    print(f"Pacote: {packed_size} bytes (razão {len(pretty) / packed_size:.2f}x sobre o JSON indent=2)")
+    print(f"  blocos {len(area)} + dicionário {len(zdict)} + cabeçalho {packed_size - len(area) - len(zdict)} bytes")
+    print(f"Blocos sem dicionário: {plain_size} bytes")
+    print(f"zlib do JSON inteiro: {whole_size} bytes")
+    if packed_size >= whole_size:
+        print("Aviso: o pacote ficou maior que o JSON inteiro comprimido; "
+              "o ganho aqui é só o acesso a blocos isolados.")
+    print(f"Decodificação (só inflate): {fmt_rate(raw_total, seconds)}")
+
+
+def cmd_unpack(args) -> None:
+    in_path = Path(args.input)
+    out_path = Path(args.output)
+    if not in_path.exists():
+        raise SystemExit(f"Arquivo de entrada não encontrado: {in_path}")
+
+    header, zdict, area = read_pack(in_path)
+    total_blocks = len(header["blocks"])
+    if args.block is not None:
+        if not 0 <= args.block < total_blocks:
+            raise SystemExit(f"Bloco {args.block} inexistente (o pacote tem {total_blocks} blocos).")
+        wanted = [args.block]
+    else:
+        wanted = range(total_blocks)
+
+    seconds, raw_total, datas = decode_throughput(header, zdict, area, wanted)
+    items: List[Dict[str, Any]] = []
+    for n, data in zip(wanted, datas):
+        items.extend(parse_block(data, n))
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(items, ensure_ascii=False, indent=args.indent), encoding="utf-8")
+
+    print(f"Itens extraídos: {len(items)} de {len(wanted)}/{total_blocks} blocos")
+    print(f"Decodificação (só inflate): {fmt_rate(raw_total, seconds)}")
+
+
+def cmd_info(args) -> None:
+    in_path = Path(args.input)
+    if not in_path.exists():
+        raise SystemExit(f"Arquivo de entrada não encontrado: {in_path}")
+
+    header, zdict, area = read_pack(in_path)
+    blocks = header["blocks"]
+    raw_total = sum(b["raw_size"] for b in blocks)
+    seconds, _, _ = decode_throughput(header, zdict, area)
+    file_size = in_path.stat().st_size
+
+    print(f"Versão: {header['version']}  nível: {header['level']}  dicionário: {header['dict_size']} bytes")
+    print(f"Blocos: {len(blocks)}  itens: {sum(b['count'] for b in blocks)}")
+    print(f"Pacote: {file_size} bytes (blocos {len(area)} + dicionário {len(zdict)}"
+          f" + cabeçalho {file_size - len(area) - len(zdict)})")
+    print(f"Descomprimido (JSON compacto): {raw_total} bytes"
+          f" (razão {raw_total / max(1, file_size):.2f}x sobre o pacote inteiro)")
+    print(f"Decodificação (só inflate): {fmt_rate(raw_total, seconds)}")
+    for n, b in enumerate(blocks):
+        print(f"- bloco {n}: {b['count']} itens, {b['size']} -> {b['raw_size']} bytes")
+
+
+def main(argv: Optional[List[str]] = None):
+    ap = argparse.ArgumentParser(
+        description="Empacota/desempacota bancos de questões com zlib + dicionário pré-definido."
+    )
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("pack", help="Comprime um JSON de quiz em blocos independentes")
+    p.add_argument("-i", "--input", required=True, help="Caminho do JSON de entrada")
+    p.add_argument("-o", "--output", required=True, help="Caminho do pacote de saída (.qzpk)")
+    p.add_argument("--block-size", type=int, default=256,
+                   help="Máximo de registros por bloco (padrão: 256)")
+    p.add_argument("--by-quiz", action="store_true",
+                   help="Inicia um bloco novo sempre que o campo 'quiz' muda")
+    p.add_argument("--dict-size", type=int, default=MAX_DICT_SIZE,
+                   help=f"Tamanho máximo do dicionário em bytes, 0 desativa (padrão: {MAX_DICT_SIZE})")
+    p.add_argument("--level", type=int, choices=range(0, 10), default=9, metavar="0-9",
+                   help="Nível de compressão zlib (padrão: 9)")
+    p.set_defaults(func=cmd_pack)
+
+    u = sub.add_parser("unpack", help="Descomprime um pacote para JSON")
+    u.add_argument("-i", "--input", required=True, help="Caminho do pacote (.qzpk)")
+    u.add_argument("-o", "--output", required=True, help="Caminho do JSON de saída")
+    u.add_argument("--block", type=int, default=None,
+                   help="Descomprime apenas este bloco (índice a partir de 0)")
+    u.add_argument("--indent", type=int, default=2,
+                   help="Indentação do JSON de saída (padrão: 2)")
+    u.set_defaults(func=cmd_unpack)
+
+    n = sub.add_parser("info", help="Mostra blocos, razão de compressão e velocidade de decodificação")
+    n.add_argument("-i", "--input", required=True, help="Caminho do pacote (.qzpk)")
+    n.set_defaults(func=cmd_info)
+
+    args = ap.parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()